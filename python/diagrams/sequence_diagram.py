@@ -3,15 +3,25 @@ Professionellt sekvensdiagram för Regiongemensam hubb
 Genererat med Python och matplotlib
 """
 
+import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib.patches import FancyBboxPatch, Rectangle, FancyArrowPatch
 from matplotlib.lines import Line2D
+from matplotlib.transforms import Bbox
+from matplotlib import font_manager, ft2font
 import matplotlib.patheffects as path_effects
 import numpy as np
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import wraps
 from typing import List, Tuple, Optional
+import hashlib
+import inspect
+import json
 import os
+import re
+import struct
+import zlib
 
 # ============================================================
 # Moderna färgpaletter (Tailwind-inspirerade)
@@ -62,21 +72,163 @@ class Participant:
     box_color: str
 
 
+@dataclass
+class Band:
+    """Ett horisontellt band (sektion) som renderas och cachas separat"""
+    top: float
+    start_y: float
+    bottom: float = 0
+    ops: list = field(default_factory=list)
+
+
+# Bandgränsen läggs så här långt (i diagramenheter) under current_y, i
+# luckan före sektionsrubriken/sidfoten, så att inga kanter hamnar på den
+BAND_GAP = 0.75
+
+
+def _recorded(method):
+    """Spela in anropet i aktuellt band så att bandet kan renderas om"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not self._replaying:
+            if method.__name__ in ('add_section', 'finalize'):
+                # Banden spelas upp var för sig, så block får inte korsa dem
+                if self._open_blocks:
+                    raise ValueError(
+                        f"{method.__name__}() called with {self._open_blocks} "
+                        f"open block(s); close them with end_block() first")
+                boundary = self.current_y - BAND_GAP
+                self._bands[-1].bottom = boundary
+                self._bands.append(Band(boundary, self.current_y))
+            self._bands[-1].ops.append((method.__name__, args, kwargs))
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class _NullAxes:
+    """Axes som ignorerar allt ritande (används vid record_only)"""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    """Bygg ett PNG-chunk med längd och CRC"""
+    return (struct.pack('>I', len(data)) + tag + data
+            + struct.pack('>I', zlib.crc32(tag + data)))
+
+
+def _adler32_combine(adler1: int, adler2: int, len2: int) -> int:
+    """Adler-32 för två sammanfogade dataströmmar (som zlibs adler32_combine)"""
+    base = 65521
+    rem = len2 % base
+    sum1 = adler1 & 0xffff
+    sum2 = (rem * sum1) % base
+    sum1 = (sum1 + (adler2 & 0xffff) + base - 1) % base
+    sum2 = (sum2 + (adler1 >> 16) + (adler2 >> 16) + base - rem) % base
+    return sum1 | (sum2 << 16)
+
+
+def _deflate_rows(pixels: np.ndarray, level: int = 6) -> Tuple[int, int, bytes]:
+    """
+    Sub-filtrera RGBA-rader och komprimera dem till fristående deflate-data
+    Returnerar (Adler-32, okomprimerad längd, data); data avslutas med full
+    flush så att flera delar kan fogas ihop till en zlib-ström.
+    """
+    rows = pixels.reshape(pixels.shape[0], -1)
+    filtered = np.empty((rows.shape[0], rows.shape[1] + 1), dtype=np.uint8)
+    filtered[:, 0] = 1  # PNG-filter Sub
+    filtered[:, 1:5] = rows[:, :4]
+    filtered[:, 5:] = rows[:, 4:] - rows[:, :-4]
+    raw = filtered.tobytes()
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    data = compressor.compress(raw) + compressor.flush(zlib.Z_FULL_FLUSH)
+    return zlib.adler32(raw), len(raw), data
+
+
+def _write_png(filename: str, width: int, height: int, dpi: int, parts):
+    """Skriv en RGBA-PNG från deflate-delar (Adler-32, längd, data) i radordning"""
+    adler = 1
+    with open(filename, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height,
+                                                8, 6, 0, 0, 0)))
+        ppm = round(dpi / 0.0254)
+        f.write(_png_chunk(b'pHYs', struct.pack('>IIB', ppm, ppm, 1)))
+        f.write(_png_chunk(b'IDAT', b'\x78\x9c'))
+        for part_adler, length, data in parts:
+            adler = _adler32_combine(adler, part_adler, length)
+            f.write(_png_chunk(b'IDAT', data))
+        # Tomt slutblock + Adler-32 avslutar zlib-strömmen
+        f.write(_png_chunk(b'IDAT', b'\x03\x00' + struct.pack('>I', adler)))
+        f.write(_png_chunk(b'IEND', b''))
+
+
+def _renderer_digest() -> str:
+    """
+    Hash av allt som påverkar ett cachat band: ritkoden, färgerna,
+    matplotlib/FreeType/zlib-versioner, alla rcParams och typsnittsfilerna
+    """
+    code = [Participant, Band, _recorded, _NullAxes, _png_chunk,
+            _adler32_combine, _deflate_rows, _write_png, SequenceDiagram]
+    # 'backend' kan vara en sentinel vars repr innehåller en minnesadress
+    params = sorted((key, value) for key, value in dict.items(matplotlib.rcParams)
+                    if key != 'backend')
+    # Vikter/stilar som ritkoden använder (fontweight='bold', style='italic')
+    fonts = [font_manager.findfont(font_manager.FontProperties(weight=weight,
+                                                               style=style))
+             for weight, style in (('normal', 'normal'), ('bold', 'normal'),
+                                   ('normal', 'italic'))]
+    inputs = [
+        *(inspect.getsource(obj) for obj in code),
+        repr(COLORS),
+        matplotlib.__version__, ft2font.__freetype_version__,
+        zlib.ZLIB_RUNTIME_VERSION,
+        repr(params),
+        *fonts,
+    ]
+    return hashlib.sha256('\0'.join(inputs).encode()).hexdigest()
+
+
 class SequenceDiagram:
     """Professionell sekvensdiagram-generator"""
 
-    def __init__(self, width: float = 24, height: float = 40):
-        self.fig, self.ax = plt.subplots(1, 1, figsize=(width, height))
-        self.ax.set_xlim(0, 100)
-        self.ax.set_ylim(0, 100)
-        self.ax.axis('off')
-        self.ax.set_facecolor('white')
-        self.fig.patch.set_facecolor('white')
+    def __init__(self, width: float = 24, height: float = 40,
+                 record_only: bool = False):
+        """
+        width: figurens bredd i tum; bestämmer skalan i både x och y
+        height: används inte för sparade bilder. Den sätter bara storleken
+        på tomma ritytan tills finalize() anpassar höjden efter innehållet
+        (y i samma skala som x)
+        record_only: spela bara in anropen utan att rita; diagrammet kan
+        då endast sparas med save_cached()
+        """
+        self.width = width
+        self.record_only = record_only
+
+        if record_only:
+            self.fig, self.ax = None, _NullAxes()
+        else:
+            self.fig, self.ax = plt.subplots(1, 1, figsize=(width, height))
+            self.ax.set_xlim(0, 100)
+            self.ax.set_ylim(0, 100)
+            self.ax.axis('off')
+            self.ax.set_facecolor('white')
+            self.fig.patch.set_facecolor('white')
 
         self.current_y = 95  # Börja från toppen
         self.participants: List[Participant] = []
         self.lifeline_start_y = 0
+        self.lifeline_end_y = 0
+
+        # Inspelade band för save_cached(); första bandet är sidhuvudet
+        self._bands: List[Band] = [Band(100, self.current_y)]
+        self._replaying = False
+        self._open_blocks = 0
+        self._finalized = False
 
+    @_recorded
     def add_title(self, title: str, subtitle: str = ""):
         """Lägg till titel"""
         self.ax.text(50, 98, title,
@@ -89,6 +241,7 @@ class SequenceDiagram:
                         color=COLORS['text_medium'], style='italic')
         self.current_y = 94
 
+    @_recorded
     def setup_participants(self, participants: List[Tuple[str, str, str, str, str]]):
         """
         Sätt upp deltagare
@@ -141,13 +294,17 @@ class SequenceDiagram:
                 return p.x
         raise ValueError(f"Participant {pid} not found")
 
-    def _draw_lifelines(self, end_y: float):
+    def _draw_lifelines(self, end_y: float, start_y: float = None):
         """Rita livslinjerna"""
+        if start_y is None:
+            start_y = self.lifeline_start_y
+
         for p in self.participants:
-            self.ax.plot([p.x, p.x], [self.lifeline_start_y, end_y],
+            self.ax.plot([p.x, p.x], [start_y, end_y],
                         color=COLORS['lifeline'], linestyle='--',
                         linewidth=1.5, zorder=1)
 
+    @_recorded
     def add_section(self, title: str, color: str = None):
         """Lägg till en sektionsrubrik"""
         self.current_y -= 2
@@ -173,6 +330,7 @@ class SequenceDiagram:
 
         self.current_y -= 3
 
+    @_recorded
     def add_message(self, from_id: str, to_id: str, text: str,
                    style: str = 'solid', response: bool = False,
                    self_message: bool = False, number: int = None):
@@ -247,6 +405,7 @@ class SequenceDiagram:
 
         self.current_y -= height
 
+    @_recorded
     def add_note(self, participant_id: str, text: str,
                 position: str = 'right', color: str = None,
                 width: float = 15):
@@ -302,6 +461,7 @@ class SequenceDiagram:
 
         self.current_y -= height + 0.5
 
+    @_recorded
     def add_note_over(self, from_id: str, to_id: str, text: str,
                      color: str = None):
         """Lägg till en notis som sträcker sig över flera deltagare"""
@@ -344,9 +504,11 @@ class SequenceDiagram:
 
         self.current_y -= height + 0.5
 
+    @_recorded
     def start_block(self, block_type: str, label: str, color: str = None):
         """Starta ett block (loop, alt, par, critical)"""
         self.current_y -= 1
+        self._open_blocks += 1
         self._block_start_y = self.current_y
         self._block_type = block_type
         self._block_label = label
@@ -362,8 +524,12 @@ class SequenceDiagram:
             color = color_map.get(block_type, '#F9FAFB')
         self._block_color = color
 
+    @_recorded
     def end_block(self):
         """Avsluta ett block"""
+        if not self._open_blocks:
+            raise ValueError("end_block() without start_block()")
+        self._open_blocks -= 1
         height = self._block_start_y - self.current_y + 1
 
         # Rita block-rektangel
@@ -403,6 +569,7 @@ class SequenceDiagram:
 
         self.current_y -= 1
 
+    @_recorded
     def add_else_divider(self, label: str):
         """Lägg till en else/alternative-avgränsare"""
         self.ax.plot([8, 92], [self.current_y, self.current_y],
@@ -416,6 +583,7 @@ class SequenceDiagram:
 
         self.current_y -= 1
 
+    @_recorded
     def add_legend(self, items: List[Tuple[str, str]]):
         """Lägg till en legend"""
         self.current_y -= 2
@@ -448,17 +616,17 @@ class SequenceDiagram:
 
         self.current_y -= legend_height + 1
 
+    @_recorded
     def add_spacer(self, height: float = 1):
         """Lägg till vertikalt utrymme"""
         self.current_y -= height
 
+    @_recorded
     def finalize(self, end_y: float = None):
         """Slutför diagrammet"""
         if end_y is None:
             end_y = self.current_y - 2
-
-        # Rita livslinjerna
-        self._draw_lifelines(end_y)
+        self.lifeline_end_y = end_y
 
         # Rita deltagare igen längst ner
         box_width = 10
@@ -481,25 +649,300 @@ class SequenceDiagram:
                         ha='center', va='center',
                         color=COLORS['text_dark'], zorder=11)
 
-        # Justera figurstorleken
-        self.ax.set_ylim(end_y - box_height - 1, 100)
+        # Justera figurstorleken: y i samma skala som x, precis som banden
+        # i save_cached(), så att save() och save_cached() ger samma bild
+        bottom = end_y - box_height - 1
+        self.ax.set_ylim(bottom, 100)
+        if not self._replaying:
+            self._bands[-1].bottom = bottom
+            self._finalized = True
+
+            # Livslinjerna ritas per band, precis som i save_cached()
+            for band in self._bands:
+                line_top, line_bottom = self._band_lifeline_span(band)
+                if line_top > line_bottom:
+                    self._draw_lifelines(line_bottom, line_top)
+
+            if self.fig is not None:
+                x0, width = self._axes_span()
+                self.ax.set_position([x0, 0, width, 1])
+                self.fig.set_figheight((100 - bottom) * self._band_scale())
 
     def save(self, filename: str, dpi: int = 150):
         """Spara diagrammet"""
-        self.fig.savefig(filename, dpi=dpi, bbox_inches='tight',
+        if self.record_only:
+            raise ValueError("record_only diagram can only be saved with save_cached()")
+
+        # Som bbox_inches='tight', men marginalen hålls inom figuren,
+        # precis som beskärningen i save_cached()
+        bbox = Bbox.intersection(self.fig.get_tightbbox().padded(0.1),
+                                 self.fig.bbox_inches)
+        self.fig.savefig(filename, dpi=dpi, bbox_inches=bbox,
                         facecolor='white', edgecolor='none')
         print(f"Saved: {filename}")
 
+    def save_cached(self, filename: str, cache_dir: str, dpi: int = 150):
+        """
+        Spara diagrammet bandvis med cache (PNG eller SVG)
+        Varje add_section-sektion (plus sidhuvud och sidfot) är ett band,
+        nycklat på bandets anrop och deltagarlayouten. Bara ändrade band
+        renderas om; övriga hämtas från cache_dir och sätts ihop.
+        Banden ritas i x-axelns skala, så en sektions storlek beror inte på
+        resten av diagrammet. Block måste avslutas inom sin sektion.
+        Cachen ligger i cache_dir/<filnamn>/; filer som inte används av
+        bygget tas bort efteråt.
+        """
+        fmt = os.path.splitext(filename)[1].lstrip('.').lower()
+        if fmt not in ('png', 'svg'):
+            raise ValueError(f"Unsupported format: {fmt}")
+        if not self._finalized:
+            raise ValueError("save_cached() requires finalize() to be called first")
+
+        cache_dir = os.path.join(cache_dir, os.path.basename(filename))
+        os.makedirs(cache_dir, exist_ok=True)
+        renderer = _renderer_digest()
+        bands = []
+        used = set()
+        rendered = 0
+
+        for band in self._bands:
+            key = self._band_key(band, renderer, fmt, dpi)
+            base = os.path.join(cache_dir, key)
+            pixels = None
+            if not os.path.exists(base + '.json'):
+                pixels = self._render_band(band, base, fmt, dpi)
+                rendered += 1
+            with open(base + '.json', encoding='utf-8') as f:
+                bands.append((band, base, json.load(f), pixels))
+            used.add(base + '.json')
+
+        if fmt == 'png':
+            used.update(self._composite_png(bands, filename, dpi))
+        else:
+            used.update(self._composite_svg(bands, filename))
+
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if path not in used:
+                os.remove(path)
+        print(f"Saved: {filename} ({rendered}/{len(bands)} band renderade)")
+
+    def _axes_span(self) -> Tuple[float, float]:
+        """Axlarnas vänsterkant och bredd som andel av figurbredden"""
+        left = plt.rcParams['figure.subplot.left']
+        return left, plt.rcParams['figure.subplot.right'] - left
+
+    def _band_scale(self) -> float:
+        """Tum per diagramenhet, samma i x och y"""
+        return self.width * self._axes_span()[1] / 100
+
+    def _band_lifeline_span(self, band: Band) -> Tuple[float, float]:
+        """Del av livslinjerna som ligger inom bandet"""
+        return (min(band.top, self.lifeline_start_y),
+                max(band.bottom, self.lifeline_end_y))
+
+    def _band_key(self, band: Band, renderer: str, fmt: str, dpi: int) -> str:
+        """Cachenyckel: bandets anrop + layout, oberoende av absolut y"""
+        line_top, line_bottom = self._band_lifeline_span(band)
+        layout = (
+            [(p.id, p.name, p.subtitle, p.x, p.color, p.box_color)
+             for p in self.participants],
+            self.width, self._axes_span(),
+            round(band.top - band.start_y, 6),
+            round(band.top - band.bottom, 6),
+            round(band.top - line_top, 6),
+            round(band.top - line_bottom, 6),
+            fmt, dpi,
+        )
+        digest = hashlib.sha256(renderer.encode())
+        digest.update(repr((band.ops, layout)).encode())
+        return digest.hexdigest()
+
+    def _render_band(self, band: Band, base: str, fmt: str,
+                     dpi: int) -> Optional[np.ndarray]:
+        """
+        Rita om ett band i en egen figur genom att spela upp dess anrop
+        Sparar <base>.json med storlek och innehållets bbox (pixlar för PNG,
+        punkter för SVG, y räknat uppifrån) och för SVG även <base>.svg.
+        För PNG returneras pixlarna; de komprimeras i _composite_png().
+        """
+        x0, width = self._axes_span()
+        height = (band.top - band.bottom) * self._band_scale()
+        height = max(round(height * dpi), 1) / dpi
+
+        sub = SequenceDiagram(self.width, height)
+        sub._replaying = True
+        sub.ax.set_position([x0, 0, width, 1])
+        sub.lifeline_start_y = self.lifeline_start_y
+        if not any(name == 'setup_participants' for name, _, _ in band.ops):
+            sub.participants = list(self.participants)
+        sub.current_y = band.start_y
+
+        for name, args, kwargs in band.ops:
+            getattr(sub, name)(*args, **kwargs)
+
+        line_top, line_bottom = self._band_lifeline_span(band)
+        if line_top > line_bottom:
+            sub._draw_lifelines(line_bottom, line_top)
+
+        sub.ax.set_ylim(band.bottom, band.top)
+        pixels = None
+        if fmt == 'png':
+            sub.fig.set_dpi(dpi)
+            sub.fig.canvas.draw()
+            pixels = np.array(sub.fig.canvas.buffer_rgba())
+            unit = dpi
+            size = pixels.shape[1], pixels.shape[0]
+        else:
+            sub.fig.savefig(base + '.svg.tmp', format='svg',
+                            facecolor='white', edgecolor='none')
+            os.replace(base + '.svg.tmp', base + '.svg')
+            unit = 72
+            size = self.width * unit, height * unit
+        bbox = sub.fig.get_tightbbox()
+        plt.close(sub.fig)
+
+        meta = {
+            'size': size,
+            'bbox': [bbox.x0 * unit, (height - bbox.y1) * unit,
+                     bbox.x1 * unit, (height - bbox.y0) * unit],
+        }
+        with open(base + '.json.tmp', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(base + '.json.tmp', base + '.json')
+        return pixels
+
+    @staticmethod
+    def _crop_box(metas: List[dict], pad: float) -> Tuple[float, ...]:
+        """Unionen av bandens bboxar plus marginal, som bbox_inches='tight'"""
+        width = metas[0]['size'][0]
+        left, top, right, bottom = width, None, 0, 0
+        y = 0
+        for meta in metas:
+            band_height = meta['size'][1]
+            x0, y0, x1, y1 = meta['bbox']
+            left, right = min(left, x0), max(right, x1)
+            y0 = y + min(max(y0, 0), band_height)
+            y1 = y + min(max(y1, 0), band_height)
+            top = y0 if top is None else min(top, y0)
+            bottom = max(bottom, y1)
+            y += band_height
+        return (max(left - pad, 0), max(top - pad, 0),
+                min(right + pad, width), min(bottom + pad, y))
+
+    def _composite_png(self, bands: list, filename: str, dpi: int) -> List[str]:
+        """
+        Stapla banden till en beskuren PNG
+        Varje bands beskurna rader komprimeras för sig och cachas bredvid
+        bandet, så oförändrade band varken ritas eller komprimeras om;
+        delarna fogas ihop till en zlib-ström med kombinerad Adler-32.
+        Returnerar de cachefiler som användes.
+        """
+        left, top, right, bottom = (round(v) for v in self._crop_box(
+            [meta for _, _, meta, _ in bands], pad=0.1 * dpi))
+        parts = []
+        used = []
+
+        y = 0
+        for band, base, meta, pixels in bands:
+            band_height = meta['size'][1]
+            row0, row1 = max(top - y, 0), min(bottom - y, band_height)
+            y += band_height
+            if row0 >= row1:
+                continue
+
+            part = f"{base}.{left}-{right}-{row0}-{row1}.deflate"
+            length = (row1 - row0) * (1 + 4 * (right - left))
+            used.append(part)
+            if os.path.exists(part):
+                with open(part, 'rb') as f:
+                    data = f.read()
+                parts.append((struct.unpack('>I', data[:4])[0], length, data[4:]))
+                continue
+
+            # Ny beskärning av ett cachat band: rita om det
+            if pixels is None:
+                pixels = self._render_band(band, base, 'png', dpi)
+            adler, _, data = _deflate_rows(pixels[row0:row1, left:right])
+            with open(part + '.tmp', 'wb') as f:
+                f.write(struct.pack('>I', adler) + data)
+            os.replace(part + '.tmp', part)
+            parts.append((adler, length, data))
+
+        _write_png(filename + '.tmp', right - left, bottom - top, dpi, parts)
+        os.replace(filename + '.tmp', filename)
+        return used
+
+    def _composite_svg(self, bands: list, filename: str) -> List[str]:
+        """
+        Nästla band-SVG:er under varandra och beskär med viewBox
+        Bandens <metadata> tas bort och glyfdefinitioner som är identiska
+        mellan banden skrivs en gång i ett gemensamt <defs>.
+        Returnerar de cachefiler som användes.
+        """
+        left, top, right, bottom = self._crop_box(
+            [meta for _, _, meta, _ in bands], pad=0.1 * 72)
+        shared = {}
+        parts = []
+        y = 0.0
+
+        for i, (_, base, meta, _) in enumerate(bands):
+            with open(base + '.svg', encoding='utf-8') as f:
+                svg = f.read()
+            svg = svg[svg.index('<svg'):]
+            svg = re.sub(r'\s*<metadata>.*?</metadata>', '', svg, flags=re.S)
+
+            # <path>-definitioner (glyfer) med samma id och innehåll delas
+            local = set()
+
+            def share(match):
+                element = match.group(0)
+                if shared.setdefault(match.group(1), element) == element:
+                    return ''
+                local.add(match.group(1))
+                return element
+
+            svg = re.sub(r'<path id="([^"]+)"[^>]*/>', share, svg)
+            svg = re.sub(r'\s*<defs>\s*</defs>', '', svg)
+
+            # Prefixa övriga id:n så att banden inte krockar i samma dokument
+            def prefix(match):
+                ref = match.group(2)
+                if ref in shared and ref not in local:
+                    return match.group(0)
+                return f"{match.group(1)}b{i}-{ref}"
+
+            svg = re.sub(r'(\bid="|href="#|url\(#)([^")]+)', prefix, svg)
+
+            root = re.match(r'<svg\b[^>]*>', svg).group(0)
+            nested = re.sub(r'(width|height)="([\d.]+)pt"', r'\1="\2"', root)
+            nested = nested.replace('<svg', f'<svg x="0" y="{y:g}"', 1)
+            parts.append(nested + svg[len(root):])
+            y += meta['size'][1]
+
+        width, height = right - left, bottom - top
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('<?xml version="1.0" encoding="utf-8" standalone="no"?>\n')
+            f.write(f'<svg xmlns="http://www.w3.org/2000/svg" '
+                    f'xmlns:xlink="http://www.w3.org/1999/xlink" '
+                    f'width="{width:g}pt" height="{height:g}pt" '
+                    f'viewBox="{left:g} {top:g} {width:g} {height:g}" '
+                    f'version="1.1">\n')
+            f.write('<defs>\n' + '\n'.join(shared.values()) + '\n</defs>\n')
+            f.write('\n'.join(parts))
+            f.write('\n</svg>\n')
+        return [base + '.svg' for _, base, _, _ in bands]
+
     def show(self):
         """Visa diagrammet"""
         plt.show()
 
 
-def create_regiongemensam_hubb_diagram():
+def create_regiongemensam_hubb_diagram(record_only: bool = False):
     """Skapa det kompletta sekvensdiagrammet för Regiongemensam hubb"""
 
     # Skapa diagram
-    diagram = SequenceDiagram(width=28, height=50)
+    diagram = SequenceDiagram(width=28, record_only=record_only)
 
     # Titel
     diagram.add_title(
@@ -703,14 +1146,16 @@ def main():
 
     # Skapa diagrammet
     print("Skapar sekvensdiagram...")
-    diagram = create_regiongemensam_hubb_diagram()
+    diagram = create_regiongemensam_hubb_diagram(record_only=True)
 
     # Spara som PNG och SVG
     png_path = os.path.join(output_dir, 'regiongemensam-hubb-sekvens.png')
     svg_path = os.path.join(output_dir, 'regiongemensam-hubb-sekvens.svg')
 
-    diagram.save(png_path, dpi=150)
-    diagram.save(svg_path)
+    # Bandvis rendering: bara ändrade sektioner rastreras om
+    cache_dir = os.path.join(output_dir, '.cache')
+    diagram.save_cached(png_path, cache_dir, dpi=150)
+    diagram.save_cached(svg_path, cache_dir)
 
     print(f"\nDiagram sparade i: {output_dir}")
     print(f"  - {os.path.basename(png_path)}")